@@ -21,6 +21,7 @@ except Exception:
 
 class AudioLSBAnalyzerPlugin:
     name = "audio_lsb_analyzer"
+    supported_mimes = ["audio/*"]
 
     def can_handle(self, mime, path):
         """
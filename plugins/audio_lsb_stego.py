@@ -16,6 +16,7 @@ from Crypto.Util.Padding import pad, unpad
 
 class AudioLSBStegoPlugin:
     name = "audio_lsb_stego"
+    supported_mimes = ["audio/*"]
 
     def can_handle(self, mime, path):
         return mime == "audio/wav" or str(path).lower().endswith(".wav")
@@ -29,7 +30,7 @@ class AudioLSBStegoPlugin:
         key = self._derive_key(password)
         iv = get_random_bytes(16)
         cipher = AES.new(key, AES.MODE_CBC, iv)
-        return iv + cipher.encrypt(pad(data, AES.block_size))
+        return iv + cipher.encrypt(pad(bytes(data), AES.block_size))
 
     def _decrypt(self, data: bytes, password: str) -> bytes:
         key = self._derive_key(password)
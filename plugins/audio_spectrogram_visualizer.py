@@ -20,6 +20,7 @@ except Exception:
 
 class AudioSpectrogramVisualizerPlugin:
     name = "audio_spectrogram_visualizer"
+    supported_mimes = ["audio/*"]
 
     # Where spectrogram images are stored
     OUTPUT_DIR = Path("uploads/spectrograms")
@@ -10,6 +10,7 @@ import base64              # Base64 encoding for frontend display
 class ImageBitplaneSuperimposedPlugin:
     # Plugin identifier
     name = "image_bitplane_superimposed"
+    supported_mimes = ["image/*"]
 
     def can_handle(self, mime, path):
         """
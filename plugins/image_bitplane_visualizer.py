@@ -10,6 +10,7 @@ import base64              # Base64 encoding for frontend transport
 class ImageBitplaneVisualizerPlugin:
     # Plugin identifier
     name = "image_bitplane_visualizer"
+    supported_mimes = ["image/*"]
 
     def can_handle(self, mime, path):
         """
@@ -10,6 +10,7 @@ import math                    # Mathematical functions
 class ImageLSBAdvancedPlugin:
     # Plugin identifier used by UniSteno backend
     name = "image_lsb_advanced"
+    supported_mimes = ["image/*"]
 
     def can_handle(self, mime, path):
         """
@@ -9,6 +9,7 @@ import math                    # Mathematical functions (logarithms)
 class ImageLSBEntropyPlugin:
     # Plugin identifier (used by the UniSteno framework)
     name = "image_lsb_entropy"
+    supported_mimes = ["image/*"]
 
     def can_handle(self, mime, path):
         """
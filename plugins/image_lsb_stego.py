@@ -16,6 +16,7 @@ MAGIC = b"UNISTENO"
 class ImageLSBStegoPlugin:
     # Plugin identifier
     name = "image_lsb_stego"
+    supported_mimes = ["image/*"]
 
     def can_handle(self, mime, path):
         """
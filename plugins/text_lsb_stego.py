@@ -2,23 +2,47 @@
 # Zero-width Unicode text steganography with optional AES encryption
 
 import base64
+import hashlib
+import os
+import struct
+from functools import lru_cache
 from pathlib import Path
 
 try:
-    from Crypto.Cipher import AES
-    from Crypto.Random import get_random_bytes
-    from Crypto.Protocol.KDF import PBKDF2
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 except Exception:
-    AES = None
+    AESGCM = None
 
 
 ZW0 = "\u200B"  # bit 0
 ZW1 = "\u200C"  # bit 1
 ZWS = "\u200D"  # separator
 
+# Lookup tables between bits and zero-width characters; each byte maps
+# straight to its 8 characters, most significant bit first
+BYTE_TO_ZW = [
+    format(b, "08b").translate(str.maketrans("01", ZW0 + ZW1))
+    for b in range(256)
+]
+ZW_TO_BIT = str.maketrans({ZW0: "0", ZW1: "1"})
+
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    # PBKDF2-HMAC-SHA1 over latin-1, as previously derived by PyCryptodome
+    return hashlib.pbkdf2_hmac(
+        "sha1", password.encode("latin-1"), salt, 100_000, dklen=32
+    )
+
+
+# PBKDF2 is deliberately slow. Extracting the same file again reuses its
+# salt, so decryption keys are cached; encryption always draws a fresh
+# salt and would only fill the cache with entries that never hit
+_derive_decrypt_key = lru_cache(maxsize=32)(_derive_key)
+
 
 class TextLSBStegoPlugin:
     name = "text_lsb_stego"
+    supported_mimes = ["text/*"]
 
     def can_handle(self, mime, path):
         return mime.startswith("text/")
@@ -26,28 +50,30 @@ class TextLSBStegoPlugin:
     # ---------------- CRYPTO ----------------
 
     def _encrypt(self, data: bytes, password: str) -> bytes:
-        salt = get_random_bytes(16)
-        key = PBKDF2(password, salt, dkLen=32, count=100_000)
-        cipher = AES.new(key, AES.MODE_GCM)
-        ciphertext, tag = cipher.encrypt_and_digest(data)
-        return salt + cipher.nonce + tag + ciphertext
+        salt = os.urandom(16)
+        key = _derive_key(password, salt)
+        nonce = os.urandom(16)
+        sealed = AESGCM(key).encrypt(nonce, bytes(data), None)
+        # Layout: salt | nonce | tag | ciphertext
+        return salt + nonce + sealed[-16:] + sealed[:-16]
 
     def _decrypt(self, data: bytes, password: str) -> bytes:
         salt = data[:16]
         nonce = data[16:32]
         tag = data[32:48]
         ciphertext = data[48:]
-        key = PBKDF2(password, salt, dkLen=32, count=100_000)
-        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
-        return cipher.decrypt_and_verify(ciphertext, tag)
+        key = _derive_decrypt_key(password, bytes(salt))
+        return AESGCM(key).decrypt(nonce, ciphertext + tag, None)
 
     # ---------------- BIT UTILS ----------------
 
-    def _to_bits(self, data: bytes) -> str:
-        return "".join(f"{b:08b}" for b in data)
+    def _to_zw(self, data: bytes) -> str:
+        return "".join(map(BYTE_TO_ZW.__getitem__, data))
 
     def _from_bits(self, bits: str) -> bytes:
-        return bytes(int(bits[i:i+8], 2) for i in range(0, len(bits), 8))
+        if not bits:
+            return b""
+        return int(bits, 2).to_bytes(len(bits) // 8, "big")
 
     # ---------------- EMBED ----------------
 
@@ -60,19 +86,14 @@ class TextLSBStegoPlugin:
         data = header + payload
 
         if password:
-            if AES is None:
-                raise Exception("PyCryptodome not installed")
+            if AESGCM is None:
+                raise Exception("cryptography not installed")
             data = self._encrypt(data, password)
 
-        b64 = base64.b64encode(data)
-        bits = self._to_bits(b64)
-
-        zw_stream = []
-        for bit in bits:
-            zw_stream.append(ZW1 if bit == "1" else ZW0)
-        zw_stream.append(ZWS)
+        # Raw bits with a 4-byte length prefix; ZWS still terminates
+        zw_stream = self._to_zw(struct.pack(">I", len(data)) + data) + ZWS
 
-        stego_text = text + "".join(zw_stream)
+        stego_text = text + zw_stream
         outfile.write_text(stego_text, encoding="utf-8")
 
         return {
@@ -87,21 +108,25 @@ class TextLSBStegoPlugin:
     def extract(self, infile: Path, password: str):
         text = infile.read_text(encoding="utf-8", errors="replace")
 
-        zw_chars = [c for c in text if c in (ZW0, ZW1, ZWS)]
+        zw_chars = "".join(c for c in text if c in (ZW0, ZW1, ZWS))
         if ZWS not in zw_chars:
             return {"error": "no hidden payload found"}
 
-        bits = ""
-        for c in zw_chars:
-            if c == ZWS:
-                break
-            bits += "1" if c == ZW1 else "0"
+        bits = zw_chars.split(ZWS, 1)[0].translate(ZW_TO_BIT)
+
+        raw = self._from_bits(bits)
+        length = int.from_bytes(raw[:4], "big")
 
-        data = base64.b64decode(self._from_bits(bits))
+        if len(raw) >= 4 and length <= len(raw) - 4:
+            data = raw[4:4 + length]
+        else:
+            # Older embeds carried base64 text, whose first four ASCII
+            # bytes never read as a plausible length
+            data = base64.b64decode(raw)
 
         if password:
-            if AES is None:
-                raise Exception("PyCryptodome not installed")
+            if AESGCM is None:
+                raise Exception("cryptography not installed")
             data = self._decrypt(data, password)
 
         name, payload = data.split(b"\0", 1)
@@ -3,15 +3,218 @@
 # Detects hidden data using Unicode abuse, whitespace patterns,
 # entropy analysis, encoding traces, and structural anomalies
 
-from PyPDF2 import PdfReader        # PDF text extraction
+import pypdfium2 as pdfium          # PDF text extraction (PDFium)
 import re                          # Regular expressions
-import math                        # Mathematical functions
 import unicodedata                 # Unicode category inspection
 from collections import Counter    # Frequency counting
+import os                          # File stat for result caching
+from pathlib import Path           # Path handling
+import threading                   # Cache lock
+import numpy as np                 # Byte/code-point buffers
+
+# Optional dependency: Numba for JIT-compiled scanning loops
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Per-code-point flag bits used by the fused scan
+ZW_FLAG = 1    # zero-width character
+HG_FLAG = 2    # homoglyph
+CF_FLAG = 4    # Unicode category Cf (invisible formatting)
+BIN_FLAG = 8   # [01]
+B64_FLAG = 16  # [A-Za-z0-9+/]
+WS_FLAG = 32   # [ \t]
+
+# Minimum run lengths for binary / base64 / whitespace traces
+BIN_MIN_RUN = 16
+B64_MIN_RUN = 20
+WS_MIN_RUN = 3
+
+# Analysis results keyed by (path, mtime_ns, size, mime)
+_cache = {}
+_cache_lock = threading.Lock()
+_CACHE_MAX = 64
+
+# Regex equivalents of the run scan (used without Numba)
+RE_BINARY = re.compile(r"[01]{16,}")
+RE_BASE64 = re.compile(r"[A-Za-z0-9+/]{20,}={0,2}")
+RE_WHITESPACE = re.compile(r"[ \t]{3,}")
+
+
+def _build_category_table():
+    """
+    Map every BMP code point to a small Unicode general category id.
+    Returns (table, {category: id}).
+    """
+    cats = [unicodedata.category(chr(i)) for i in range(0x10000)]
+    ids = {cat: i for i, cat in enumerate(sorted(set(cats)))}
+    return np.array([ids[c] for c in cats], dtype=np.uint8), ids
+
+
+CAT_TABLE, CAT_IDS = _build_category_table()
+CF_ID = CAT_IDS["Cf"]
+
+# Line boundaries recognized by str.splitlines
+LINE_BREAKS = np.array(
+    [0x0A, 0x0B, 0x0C, 0x0D, 0x1C, 0x1D, 0x1E, 0x85, 0x2028, 0x2029],
+    dtype=np.uint32
+)
+
+# BMP code points for which str.isspace() is true (none lie above it)
+SPACE_TABLE = np.array([chr(i).isspace() for i in range(0x10000)])
+
+
+def _line_lengths(cps):
+    """
+    Lengths of the non-blank lines in a UTF-32 code-point buffer,
+    matching [len(l) for l in text.splitlines() if l.strip()].
+    A CRLF pair yields an extra empty line, which is dropped as blank.
+    """
+    breaks = np.flatnonzero(np.isin(cps, LINE_BREAKS))
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [cps.size]))
+
+    # Non-whitespace characters per line via a running count
+    bmp = np.minimum(cps, 0xFFFF)
+    ink = (~SPACE_TABLE[bmp] | (cps > 0xFFFF)).cumsum()
+    ink = np.concatenate(([0], ink))
+
+    keep = ink[ends] > ink[starts]
+    return (ends - starts)[keep]
+
+
+def _build_char_flags(zero_width, homoglyphs):
+    """
+    Build a BMP (0..0xFFFF) lookup table of per-character flag bits.
+    """
+    flags = (CAT_TABLE == CF_ID).astype(np.uint8) * CF_FLAG
+    for c in zero_width:
+        flags[ord(c)] |= ZW_FLAG
+    for c in homoglyphs:
+        flags[ord(c)] |= HG_FLAG
+    for c in "01":
+        flags[ord(c)] |= BIN_FLAG
+    for c in ("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+              "0123456789+/"):
+        flags[ord(c)] |= B64_FLAG
+    for c in " \t":
+        flags[ord(c)] |= WS_FLAG
+    return flags
+
+
+def _fused_scan_loop(cps, flags):
+    """
+    Single pass over UTF-32 code points.
+    Returns (utf8_byte_histogram, zero_width, homoglyphs, cf_bmp,
+             binary_runs, base64_runs, whitespace_runs).
+    Only used when compiled by Numba.
+    """
+    hist = np.zeros(256, np.int64)
+    zw = 0
+    hg = 0
+    cf = 0
+
+    # Current run lengths and completed runs above threshold
+    bin_run = b64_run = ws_run = 0
+    bin_runs = b64_runs = ws_runs = 0
+
+    for i in range(cps.size):
+        cp = cps[i]
+
+        # UTF-8 byte histogram (lone surrogates encode as "?")
+        if cp < 0x80:
+            hist[cp] += 1
+        elif cp < 0x800:
+            hist[0xC0 | (cp >> 6)] += 1
+            hist[0x80 | (cp & 0x3F)] += 1
+        elif 0xD800 <= cp < 0xE000:
+            hist[0x3F] += 1
+        elif cp < 0x10000:
+            hist[0xE0 | (cp >> 12)] += 1
+            hist[0x80 | ((cp >> 6) & 0x3F)] += 1
+            hist[0x80 | (cp & 0x3F)] += 1
+        else:
+            hist[0xF0 | (cp >> 18)] += 1
+            hist[0x80 | ((cp >> 12) & 0x3F)] += 1
+            hist[0x80 | ((cp >> 6) & 0x3F)] += 1
+            hist[0x80 | (cp & 0x3F)] += 1
+
+        f = flags[cp] if cp < 0x10000 else 0
+        zw += f & ZW_FLAG
+        hg += (f & HG_FLAG) >> 1
+        cf += (f & CF_FLAG) >> 2
+
+        # Run-length state machines (maximal runs, like re.findall)
+        if f & BIN_FLAG:
+            bin_run += 1
+        else:
+            if bin_run >= BIN_MIN_RUN:
+                bin_runs += 1
+            bin_run = 0
+
+        if f & B64_FLAG:
+            b64_run += 1
+        else:
+            if b64_run >= B64_MIN_RUN:
+                b64_runs += 1
+            b64_run = 0
+
+        if f & WS_FLAG:
+            ws_run += 1
+        else:
+            if ws_run >= WS_MIN_RUN:
+                ws_runs += 1
+            ws_run = 0
+
+    if bin_run >= BIN_MIN_RUN:
+        bin_runs += 1
+    if b64_run >= B64_MIN_RUN:
+        b64_runs += 1
+    if ws_run >= WS_MIN_RUN:
+        ws_runs += 1
+
+    return hist, zw, hg, cf, bin_runs, b64_runs, ws_runs
+
+
+# Plugins load via spec_from_file_location, so Numba cannot cache the
+# compiled kernel on disk. Compile it once per process on a background
+# thread; until it is ready, _char_stats uses the NumPy / regex path.
+_fused_scan = None
+
+
+def _warm_fused_scan():
+    global _fused_scan
+    kernel = njit(_fused_scan_loop)
+    try:
+        # Same argument types as _char_stats: read-only uint32 code points
+        # from np.frombuffer and the writable uint8 flag table
+        kernel(np.frombuffer(bytes(4), np.uint32), np.zeros(0x10000, np.uint8))
+    except Exception:
+        return
+    _fused_scan = kernel
+
+
+if njit:
+    threading.Thread(
+        target=_warm_fused_scan, name="text-scan-jit", daemon=True
+    ).start()
+
+
+def _hist_entropy(counts):
+    """
+    Shannon entropy of a histogram.
+    """
+    total = counts.sum()
+    if not total:
+        return 0.0
+    p = counts[counts > 0] / total
+    return float(-(p * np.log2(p)).sum())
 
 class TextStegoAnalyzerPlugin:
     # Plugin identifier
     name = "text_stego_analyzer"
+    supported_mimes = ["text/*", "application/pdf", "application/octet-stream"]
 
     # Unicode zero-width characters commonly used in text steganography
     ZERO_WIDTH = [
@@ -29,6 +232,9 @@ class TextStegoAnalyzerPlugin:
         "с": "c", "х": "x", "і": "i", "ј": "j"
     }
 
+    # BMP flag table for the fused character scan
+    CHAR_FLAGS = _build_char_flags(ZERO_WIDTH, HOMOGLYPHS)
+
     def can_handle(self, mime, path):
         """
         Determine whether this plugin can analyze the file.
@@ -47,34 +253,93 @@ class TextStegoAnalyzerPlugin:
 
     def _entropy(self, s):
         """
-        Compute Shannon entropy of a string.
+        Compute Shannon entropy of a string over its UTF-8 bytes.
         Higher entropy often indicates encoded or compressed data.
         """
         if not s:
             return 0.0
-        counts = Counter(s)
-        total = len(s)
-        return -sum(
-            (c / total) * math.log2(c / total)
-            for c in counts.values()
+        buf = np.frombuffer(s.encode("utf-8", "replace"), np.uint8)
+        return _hist_entropy(np.bincount(buf, minlength=256))
+
+    def _char_stats(self, text):
+        """
+        Character-level statistics: zero-width count, homoglyph count,
+        Cf (invisible control) count, entropy, binary / base64 /
+        whitespace run counts and non-blank line lengths.
+        Uses one fused Numba pass when available.
+        """
+        cps = np.frombuffer(
+            text.encode("utf-32-le", "surrogatepass"), np.uint32
+        )
+
+        # Supplementary planes are outside the BMP tables (rare)
+        supplementary = Counter(
+            unicodedata.category(chr(cp))
+            for cp in cps[cps >= 0x10000].tolist()
         )
 
+        if _fused_scan is None:
+            # One table gather classifies every BMP character at once
+            flags = self.CHAR_FLAGS[cps[cps < 0x10000]]
+            return {
+                "zero_width": int(np.count_nonzero(flags & ZW_FLAG)),
+                "homoglyphs": int(np.count_nonzero(flags & HG_FLAG)),
+                "cf": int(np.count_nonzero(flags & CF_FLAG))
+                      + supplementary["Cf"],
+                "entropy": self._entropy(text),
+                "binary_runs": len(RE_BINARY.findall(text)),
+                "base64_runs": len(RE_BASE64.findall(text)),
+                "whitespace_runs": len(RE_WHITESPACE.findall(text)),
+                "line_lengths": _line_lengths(cps)
+            }
+
+        hist, zw, hg, cf, bin_runs, b64_runs, ws_runs = _fused_scan(
+            cps, self.CHAR_FLAGS
+        )
+        cf += supplementary["Cf"]
+
+        return {
+            "zero_width": int(zw),
+            "homoglyphs": int(hg),
+            "cf": int(cf),
+            "entropy": _hist_entropy(hist),
+            "binary_runs": int(bin_runs),
+            "base64_runs": int(b64_runs),
+            "whitespace_runs": int(ws_runs),
+            "line_lengths": _line_lengths(cps)
+        }
+
     def _extract_text(self, path, mime):
         """
         Extract textual content from file.
         Uses PDF parsing for PDFs, raw decoding for others.
         """
-        if mime == "application/pdf":
+        # The server passes UI options as the second argument,
+        # so also recognize PDFs by extension
+        is_pdf = (
+            mime == "application/pdf"
+            or Path(path).suffix.lower() == ".pdf"
+        )
+
+        if is_pdf:
+            try:
+                pdf = pdfium.PdfDocument(str(path))
+            except Exception:
+                return ""
             try:
-                reader = PdfReader(path)
-                text = ""
-                for page in reader.pages:
-                    t = page.extract_text()
+                parts = []
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    t = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
                     if t:
-                        text += t + "\n"
-                return text
+                        parts.append(t)
+                return "\n".join(parts) + ("\n" if parts else "")
             except Exception:
                 return ""
+            finally:
+                pdf.close()
         else:
             try:
                 with open(path, "r", errors="ignore") as f:
@@ -83,6 +348,31 @@ class TextStegoAnalyzerPlugin:
                 return ""
 
     def analyze(self, path, mime=None):
+        """
+        Cached wrapper around _analyze.
+        Results depend only on file contents, so they are reused until
+        the file's mtime or size changes.
+        """
+        st = os.stat(path)
+        key = (
+            str(path), st.st_mtime_ns, st.st_size,
+            mime if isinstance(mime, str) else None
+        )
+
+        with _cache_lock:
+            if key in _cache:
+                return dict(_cache[key])
+
+        result = self._analyze(path, mime)
+
+        with _cache_lock:
+            if len(_cache) >= _CACHE_MAX:
+                _cache.pop(next(iter(_cache)))
+            _cache[key] = result
+
+        return dict(result)
+
+    def _analyze(self, path, mime=None):
         """
         Perform multi-feature text steganalysis:
         - Zero-width character detection
@@ -99,26 +389,28 @@ class TextStegoAnalyzerPlugin:
 
         # ================= CHARACTER-LEVEL ANALYSIS =================
 
+        stats = self._char_stats(text)
+
         # Count zero-width characters
-        zw_count = sum(text.count(z) for z in self.ZERO_WIDTH)
+        zw_count = stats["zero_width"]
 
         # Count long whitespace runs (space / tab)
-        whitespace_runs = len(re.findall(r"[ \t]{3,}", text))
+        whitespace_runs = stats["whitespace_runs"]
 
         # Count homoglyph substitutions
-        homoglyphs = sum(1 for c in text if c in self.HOMOGLYPHS)
+        homoglyphs = stats["homoglyphs"]
 
         # ================= ENCODING SIGNATURES =================
 
         # Long binary sequences
-        binary_runs = len(re.findall(r"[01]{16,}", text))
+        binary_runs = stats["binary_runs"]
 
         # Base64-like patterns
-        base64_runs = len(re.findall(r"[A-Za-z0-9+/]{20,}={0,2}", text))
+        base64_runs = stats["base64_runs"]
 
         # ================= ENTROPY =================
 
-        entropy = self._entropy(text)
+        entropy = stats["entropy"]
 
         # Normalize entropy: natural text ≈ 3.5–4.5 bits
         entropy_norm = (
@@ -128,20 +420,18 @@ class TextStegoAnalyzerPlugin:
 
         # ================= UNICODE CONTROL CHARACTERS =================
 
-        categories = Counter(unicodedata.category(c) for c in text)
-
         # Cf = invisible formatting/control characters
-        control_ratio = categories.get("Cf", 0) / length
+        control_ratio = stats["cf"] / length
 
         # ================= STRUCTURAL ANALYSIS =================
 
-        lines = text.splitlines()
-        line_lengths = [len(l) for l in lines if l.strip()]
+        line_lengths = stats["line_lengths"]
 
         # Variance in line length can indicate fixed-width encoding
         line_var = (
-            (max(line_lengths) - min(line_lengths)) / max(line_lengths)
-            if line_lengths else 0.0
+            float(line_lengths.max() - line_lengths.min())
+            / float(line_lengths.max())
+            if line_lengths.size else 0.0
         )
 
         # ================= NORMALIZATION =================
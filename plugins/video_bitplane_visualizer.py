@@ -1,18 +1,130 @@
 # video_bitplane_visualizer.py
 # Frame-wise RGB + SUPER bitplane visualization for videos
-# Uses MJPEG (AVI) for guaranteed browser playback
-
+# All 32 bitplanes are tiled into a single mosaic video:
+# rows = R / G / B / SUPER, columns = bit 0..7
+# Encoded as H.264 (MP4) through ffmpeg, or MJPEG (AVI) without it
+
+import os
+import shutil
+import subprocess
+import tempfile
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+CHANNELS = ["R", "G", "B", "SUPER"]
+
+# Bit shifts broadcast over the column axis: (8, 1) against (H, 1, W)
+SHIFTS = np.arange(8, dtype=np.uint8)[:, None]
+
+# Upper bound on frames rendered concurrently (decode, NumPy and encode
+# release the GIL); INFLIGHT_BYTES lowers it for large frames
+WORKERS = min(8, os.cpu_count() or 1)
+
+# Tiles are downscaled to the width the UI draws them at (solve.js caps
+# tiles at 320 px); full-resolution 1080p mosaics were 15360x4320
+TILE_MAX_WIDTH = 320
+
+# Memory budget for all mosaic buffers. A 16:9 mosaic is ~5.5 MB, so
+# this only limits concurrency for unusually tall inputs
+INFLIGHT_BYTES = 384 * 1024 * 1024
+
+# Optional external encoder: raw BGR piped into ffmpeg's libx264
+FFMPEG = shutil.which("ffmpeg")
+
+
+class _FFmpegWriter:
+    """
+    Minimal cv2.VideoWriter stand-in feeding an ffmpeg stdin pipe.
+    """
+
+    def __init__(self, proc, errfile):
+        self.proc = proc
+        self.errfile = errfile
+
+    def write(self, frame):
+        # Mosaics are C-contiguous, so the buffer is written without a copy
+        self.proc.stdin.write(frame)
+
+    def release(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg already exited; its status is reported below
+
+        status = self.proc.wait()
+        self.errfile.seek(0)
+        err = self.errfile.read()
+        self.errfile.close()
+        if status != 0:
+            raise ValueError(f"ffmpeg failed: {err.decode(errors='replace')}")
+
+
 class VideoBitplaneVisualizerPlugin:
     name = "video_bitplane_visualizer"
+    supported_mimes = ["video/*"]
 
     def can_handle(self, mime, path):
         return mime and mime.startswith("video/")
 
+    def _render_tile(self, frame, tile):
+        """
+        Fill a preallocated BGR mosaic (rows R / G / B / SUPER,
+        columns bit 0..7) in place for one decoded frame.
+        Only the channel planes below are written; the rest stay zero.
+        """
+        H = tile.shape[0] // len(CHANNELS)
+        W = tile.shape[1] // 8
+
+        # Nearest neighbour keeps pixel values intact, so every bitplane
+        # shows real bits rather than interpolated ones
+        if frame.shape[:2] != (H, W):
+            frame = cv2.resize(frame, (W, H), interpolation=cv2.INTER_NEAREST)
+
+        # OpenCV frames are BGR; index channels directly (no cvtColor copy)
+        B, G, R = frame[:, :, 0], frame[:, :, 1], frame[:, :, 2]
+
+        # Mosaic rows viewed as (H, 8, W, 3); planes broadcast to (H, 8, W)
+        rows = tile.reshape(len(CHANNELS), H, 8, W, 3)
+
+        for row, ch, src in ((0, 2, R), (1, 1, G), (2, 0, B)):
+            plane = rows[row, ..., ch]
+            np.right_shift(src[:, None, :], SHIFTS, out=plane)
+            np.bitwise_and(plane, 1, out=plane)
+            np.multiply(plane, 255, out=plane)
+
+            # SUPER row combines all three channels
+            rows[3, ..., ch] = plane
+
+        return tile
+
+    def _open_ffmpeg(self, outfile, fps, width, height):
+        """
+        Start one ffmpeg process encoding raw BGR mosaics to H.264.
+        Returns an object with the write / release interface of
+        cv2.VideoWriter.
+        """
+        cmd = [
+            FFMPEG, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-c:v", "libx264", "-preset", "ultrafast",
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            str(outfile)
+        ]
+        # stderr goes to a file: an unread pipe could fill up and block
+        # ffmpeg while this process is still writing frames to it
+        errfile = tempfile.TemporaryFile()
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=errfile)
+        except Exception:
+            errfile.close()
+            raise
+        return _FFmpegWriter(proc, errfile)
+
     def analyze(self, path, options=None):
         path = Path(path)
         video_name = path.stem
@@ -25,59 +137,79 @@ class VideoBitplaneVisualizerPlugin:
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        out_dir = Path("uploads/video_bitplanes") / video_name
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        fourcc = cv2.VideoWriter_fourcc(*"MJPG")
-
-        writers = {
-            ch: {
-                bit: cv2.VideoWriter(
-                    str(out_dir / f"{ch}_bit_{bit}.avi"),
-                    fourcc,
+        # Release the capture and stop ffmpeg even if rendering fails
+        writer = None
+        try:
+            out_dir = Path("uploads/video_bitplanes") / video_name
+            out_dir.mkdir(parents=True, exist_ok=True)
+
+            # Tile size: never upscale, keep the aspect ratio
+            W = max(1, min(width, TILE_MAX_WIDTH))
+            H = max(1, round(height * W / max(width, 1)))
+
+            # One writer for the whole 4x8 mosaic instead of 32 separate encodes
+            if FFMPEG:
+                out_name = "bitplanes.mp4"
+                writer = self._open_ffmpeg(
+                    out_dir / out_name, fps, W * 8, H * len(CHANNELS)
+                )
+            else:
+                out_name = "bitplanes.avi"
+                writer = cv2.VideoWriter(
+                    str(out_dir / out_name),
+                    cv2.VideoWriter_fourcc(*"MJPG"),
                     fps,
-                    (width, height),
+                    (W * 8, H * len(CHANNELS)),
                     isColor=True
                 )
-                for bit in range(8)
-            }
-            for ch in ["R", "G", "B", "SUPER"]
-        }
-
-        frames = 0
-
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            R, G, B = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
-
-            for bit in range(8):
-                r = ((R >> bit) & 1) * 255
-                g = ((G >> bit) & 1) * 255
-                b = ((B >> bit) & 1) * 255
-
-                writers["R"][bit].write(cv2.merge([r, np.zeros_like(r), np.zeros_like(r)]))
-                writers["G"][bit].write(cv2.merge([np.zeros_like(g), g, np.zeros_like(g)]))
-                writers["B"][bit].write(cv2.merge([np.zeros_like(b), np.zeros_like(b), b]))
-                writers["SUPER"][bit].write(cv2.merge([r, g, b]))
-
-            frames += 1
-
-        cap.release()
-        for ch in writers:
-            for bit in writers[ch]:
-                writers[ch][bit].release()
-
+            frames = 0
+
+            # In-flight depth is bounded by bytes, not cores: the ring of
+            # depth + 1 mosaics stays within INFLIGHT_BYTES (min. two mosaics)
+            mosaic_shape = (H * len(CHANNELS), W * 8, 3)
+            mosaic_bytes = max(1, H * len(CHANNELS) * W * 8 * 3)
+            depth = max(1, min(WORKERS * 2, INFLIGHT_BYTES // mosaic_bytes - 1))
+
+            # Ring of reusable mosaics, allocated on first use: at most depth
+            # frames are in flight, so a buffer is never reused before it has
+            # been written
+            tiles = []
+
+            # Decode on this thread, render tiles on the pool, write in order.
+            # No more workers than frames the memory budget lets be in flight.
+            with ThreadPoolExecutor(max_workers=min(WORKERS, depth)) as pool:
+                pending = deque()
+                submitted = 0
+
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+
+                    slot = submitted % (depth + 1)
+                    if slot == len(tiles):
+                        tiles.append(np.zeros(mosaic_shape, np.uint8))
+                    tile = tiles[slot]
+                    pending.append(pool.submit(self._render_tile, frame, tile))
+                    submitted += 1
+
+                    # Bound the number of in-flight frames
+                    if len(pending) > depth:
+                        writer.write(pending.popleft().result())
+                        frames += 1
+
+                while pending:
+                    writer.write(pending.popleft().result())
+                    frames += 1
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+
+        # (row, col) of every bitplane inside the mosaic, for UI cropping
         planes = {
-            ch: {
-                f"bit_{bit}": f"/uploads/video_bitplanes/{video_name}/{ch}_bit_{bit}.avi"
-                for bit in range(8)
-            }
-            for ch in ["R", "G", "B", "SUPER"]
+            ch: {f"bit_{bit}": [row, bit] for bit in range(8)}
+            for row, ch in enumerate(CHANNELS)
         }
 
         return {
@@ -85,5 +217,8 @@ class VideoBitplaneVisualizerPlugin:
             "frames": frames,
             "width": width,
             "height": height,
+            "tile_width": W,
+            "tile_height": H,
+            "mosaic": f"/uploads/video_bitplanes/{video_name}/{out_name}",
             "planes": planes
         }
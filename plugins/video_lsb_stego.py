@@ -3,19 +3,138 @@
 
 import cv2
 import numpy as np
+import shutil
 import struct
+import subprocess
+import tempfile
+import threading
 import zlib
+from functools import partial
 from pathlib import Path
 from hashlib import sha256
 
+# Optional dependency: hardware-accelerated CRC32C (SSE4.2 / ARMv8 CRC)
+try:
+    import crc32c
+except Exception:
+    crc32c = None
+
+# Optional dependency: Numba for the partial shuffle loop
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+
+def _partial_shuffle_py(n, offsets):
+    """
+    First k = offsets.size entries of a Fisher-Yates shuffle of range(n),
+    where step i swaps i with i + offsets[i].
+    Prefixes up to half of n track swaps in a dict instead of an n-sized
+    list. Used until the Numba kernel below has compiled.
+    """
+    k = offsets.size
+    offs = offsets.tolist()
+
+    # Large prefix: a dense index list is cheaper than a dict
+    if k * 2 > n:
+        idx = list(range(n))
+        for i, off in enumerate(offs):
+            j = i + off
+            idx[i], idx[j] = idx[j], idx[i]
+        return np.array(idx[:k], dtype=np.int64)
+
+    out = [0] * k
+    swaps = {}
+    get = swaps.get
+    for i, off in enumerate(offs):
+        j = i + off
+        out[i] = get(j, j)
+        swaps[j] = get(i, i)
+    return np.array(out, dtype=np.int64)
+
+
+def _partial_shuffle_loop(n, offsets):
+    """
+    Numba kernel for the same shuffle as _partial_shuffle_py.
+    """
+    k = offsets.size
+
+    # Large prefix: a dense index array is cheaper than a dict
+    if k * 16 > n:
+        idx = np.arange(n)
+        for i in range(k):
+            j = i + offsets[i]
+            t = idx[i]
+            idx[i] = idx[j]
+            idx[j] = t
+        return idx[:k].copy()
+
+    out = np.empty(k, np.int64)
+    swaps = {-1: -1}  # typed int64 -> int64 for Numba; key never used
+    for i in range(k):
+        j = i + offsets[i]
+        out[i] = swaps.get(j, j)
+        swaps[j] = swaps.get(i, i)
+    return out
+
+
+# Plugins load via spec_from_file_location, so Numba cannot cache the
+# compiled kernel on disk. Compile it once per process on a background
+# thread; until it is ready, _partial_shuffle uses the Python loop.
+_shuffle_kernel = None
+
+
+def _warm_shuffle_kernel():
+    global _shuffle_kernel
+    kernel = njit(_partial_shuffle_loop)
+    try:
+        # Same argument types as _scatter_positions: int, int64 array
+        kernel(16, np.zeros(1, np.int64))
+    except Exception:
+        return
+    _shuffle_kernel = kernel
+
+
+if njit:
+    threading.Thread(
+        target=_warm_shuffle_kernel, name="video-shuffle-jit", daemon=True
+    ).start()
+
+
+def _partial_shuffle(n, offsets):
+    kernel = _shuffle_kernel
+    if kernel is not None:
+        return kernel(n, offsets)
+    return _partial_shuffle_py(n, offsets)
+
+
+# Optional external encoder: multi-threaded FFV1 via ffmpeg
+FFMPEG = shutil.which("ffmpeg")
+
 
 class VideoLSBStegoPlugin:
     name = "video_lsb_stego"
+    supported_mimes = ["video/*"]
 
+    VERSION_FMT = ">B"
     FNAME_LEN_FMT = ">H"   # uint16
     PAYLOAD_LEN_FMT = ">I"
     CRC_FMT = ">I"
 
+    # Leading format byte. 3 / 4: partial-shuffle positions (sequential
+    # without a password) with zlib CRC32 / CRC32C. Older streams were
+    # laid out with a full permutation and start with 2 (CRC32C) or,
+    # having no version byte, with the high byte of the filename length,
+    # which is 0 (zlib CRC32).
+    VERSION_CRC32 = 3
+    VERSION_CRC32C = 4
+    LEGACY_VERSION_CRC32C = 2
+    MAX_FNAME_BYTES = 255
+
+    # version + fname_len + longest fname + payload_len
+    HEADER_MAX_BITS = 8 + 16 + MAX_FNAME_BYTES * 8 + 32
+
     def can_handle(self, mime, path):
         return mime and mime.startswith("video/")
 
@@ -25,6 +144,31 @@ class VideoLSBStegoPlugin:
         )
         return np.random.default_rng(seed)
 
+    def _positions(self, password, n, k):
+        """
+        First k bit positions for this password. Any prefix is stable,
+        so callers can ask for just the header first and the full
+        payload later.
+        Without a password there is no secret to seed the scatter with,
+        so bits are laid out sequentially and no RNG work is done.
+        """
+        if not password:
+            return np.arange(min(k, n))
+        return self._scatter_positions(password, n, k)
+
+    def _scatter_positions(self, password, n, k):
+        """
+        First k positions of a password-seeded random permutation of
+        range(n).
+        """
+        k = min(k, n)
+        u = self._rng(password).random(k)
+        offsets = (u * (n - np.arange(k))).astype(np.int64)
+        return _partial_shuffle(n, offsets)
+
+    def _crc32(self, data):
+        return zlib.crc32(data) & 0xFFFFFFFF
+
     # ================= EMBED =================
     def embed(self, infile, payload, password, outfile, payload_name=None):
         infile = Path(infile)
@@ -34,7 +178,7 @@ class VideoLSBStegoPlugin:
             payload_name = "payload.bin"
 
         fname_bytes = payload_name.encode("utf-8")
-        if len(fname_bytes) > 65535:
+        if len(fname_bytes) > self.MAX_FNAME_BYTES:
             raise ValueError("Filename too long")
 
         cap = cv2.VideoCapture(str(infile))
@@ -52,9 +196,16 @@ class VideoLSBStegoPlugin:
         blue = frame0[:, :, 0].reshape(-1)
 
         payload_len = len(payload)
-        crc = zlib.crc32(payload) & 0xFFFFFFFF
+
+        if crc32c is not None:
+            version = struct.pack(self.VERSION_FMT, self.VERSION_CRC32C)
+            crc = crc32c.crc32c(payload)
+        else:
+            version = struct.pack(self.VERSION_FMT, self.VERSION_CRC32)
+            crc = self._crc32(payload)
 
         data = (
+            version +
             struct.pack(self.FNAME_LEN_FMT, len(fname_bytes)) +
             fname_bytes +
             struct.pack(self.PAYLOAD_LEN_FMT, payload_len) +
@@ -67,13 +218,27 @@ class VideoLSBStegoPlugin:
         if bits.size > blue.size:
             raise ValueError("Payload too large for first frame")
 
-        perm = self._rng(password).permutation(blue.size)
-
-        for i, bit in enumerate(bits):
-            blue[perm[i]] = (blue[perm[i]] & 0xFE) | bit
+        idxs = self._positions(password, blue.size, bits.size)
+        blue[idxs] = (blue[idxs] & 0xFE) | bits
 
         frame0[:, :, 0] = blue.reshape(height, width)
 
+        try:
+            if FFMPEG:
+                self._write_ffmpeg(cap, frame0, fps, width, height, outfile)
+            else:
+                self._write_cv2(cap, frame0, fps, width, height, outfile)
+        finally:
+            cap.release()
+
+        return {
+            "outfile": outfile.name,
+            "method": "First-frame BLUE-channel LSB (lossless)",
+            "payload_name": payload_name,
+            "payload_bytes": payload_len
+        }
+
+    def _write_cv2(self, cap, frame0, fps, width, height, outfile):
         fourcc = cv2.VideoWriter_fourcc(*"FFV1")
         out = cv2.VideoWriter(str(outfile), fourcc, fps, (width, height))
 
@@ -84,15 +249,45 @@ class VideoLSBStegoPlugin:
                 break
             out.write(frame)
 
-        cap.release()
         out.release()
 
-        return {
-            "outfile": outfile.name,
-            "method": "First-frame BLUE-channel LSB (lossless)",
-            "payload_name": payload_name,
-            "payload_bytes": payload_len
-        }
+    def _write_ffmpeg(self, cap, frame0, fps, width, height, outfile):
+        """
+        Pipe raw BGR frames into ffmpeg's slice-threaded FFV1 encoder.
+        bgr0 keeps every pixel (and the embedded LSBs) bit-exact.
+        """
+        cmd = [
+            FFMPEG, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-c:v", "ffv1", "-level", "3", "-slices", "16", "-threads", "0",
+            "-pix_fmt", "bgr0", str(outfile)
+        ]
+        # stderr goes to a file: an unread pipe could fill up and block
+        # ffmpeg while this process is still writing frames to it
+        with tempfile.TemporaryFile() as errfile:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=errfile)
+
+            try:
+                proc.stdin.write(frame0)
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    proc.stdin.write(frame)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its status is checked below
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+                status = proc.wait()
+
+            if status != 0:
+                errfile.seek(0)
+                err = errfile.read()
+                raise ValueError(f"ffmpeg failed: {err.decode(errors='replace')}")
 
     # ================= EXTRACT =================
     def extract(self, infile, password):
@@ -106,47 +301,104 @@ class VideoLSBStegoPlugin:
             raise ValueError("Cannot read first frame")
 
         blue = frame0[:, :, 0].reshape(-1)
-        perm = self._rng(password).permutation(blue.size)
 
-        idx = 0
+        password = password or ""
+        versions = (self.VERSION_CRC32, self.VERSION_CRC32C)
+
+        if not password:
+            sequential = self._header_cached(
+                partial(self._positions, password, blue.size))
+            if self._read_version(blue, sequential) in versions:
+                try:
+                    return self._read_stream(blue, sequential)
+                except ValueError:
+                    pass  # Password-less stream from before sequential layout
+
+        # A full-permutation stream can read as version 3 / 4 under the
+        # scatter layout by chance, so a failed parse falls through
+        scatter_error = None
+        scatter = self._header_cached(
+            partial(self._scatter_positions, password, blue.size))
+        if self._read_version(blue, scatter) in versions:
+            try:
+                return self._read_stream(blue, scatter)
+            except ValueError as e:
+                scatter_error = e
+
+        # Streams embedded before the partial shuffle used a full permutation
+        perm = self._rng(password).permutation(blue.size)
+        try:
+            return self._read_stream(blue, lambda k: perm)
+        except ValueError:
+            if scatter_error is not None:
+                raise scatter_error
+            raise
+
+    def _header_cached(self, positions_for):
+        """
+        Compute the header prefix once and share it between the version
+        probe and the header read; only the body needs a longer prefix.
+        """
+        head = positions_for(self.HEADER_MAX_BITS)
+        return lambda k: head if k <= self.HEADER_MAX_BITS else positions_for(k)
+
+    def _read_version(self, blue, positions_for):
+        return int(np.packbits(blue[positions_for(8)] & 1)[0])
+
+    def _read_stream(self, blue, positions_for):
+        """
+        Parse version | fname_len | fname | payload_len | payload | CRC
+        from the blue LSBs. positions_for(k) returns at least the first
+        k bit positions.
+        """
+        # One gather for every header field: the filename length is not
+        # known yet, so read up to the longest possible header and slice
+        header_pos = positions_for(self.HEADER_MAX_BITS)[:self.HEADER_MAX_BITS]
+        header = np.packbits(blue[header_pos] & 1).tobytes()
+
+        # ---- format version ----
+        version = header[0]
+        if version in (self.VERSION_CRC32C, self.LEGACY_VERSION_CRC32C):
+            if crc32c is None:
+                raise ValueError("crc32c package required to verify this payload")
+            checksum = crc32c.crc32c
+            idx = 1
+        elif version == self.VERSION_CRC32:
+            checksum = self._crc32
+            idx = 1
+        elif version == 0:
+            checksum = self._crc32
+            idx = 0
+        else:
+            raise ValueError("No payload found – wrong password or clean video")
 
         # ---- filename length ----
-        fname_len_bits = [blue[perm[idx + i]] & 1 for i in range(16)]
-        fname_len = struct.unpack(
-            self.FNAME_LEN_FMT,
-            np.packbits(fname_len_bits).tobytes()
-        )[0]
-        idx += 16
+        fname_len = struct.unpack_from(self.FNAME_LEN_FMT, header, idx)[0]
+        idx += 2
+
+        if fname_len > self.MAX_FNAME_BYTES:
+            raise ValueError("Invalid or corrupted filename length")
 
         # ---- filename ----
-        fname_bits = [blue[perm[idx + i]] & 1 for i in range(fname_len * 8)]
-        filename = np.packbits(fname_bits).tobytes().decode("utf-8")
-        idx += fname_len * 8
+        filename = header[idx: idx + fname_len].decode("utf-8")
+        idx += fname_len
 
         # ---- payload length ----
-        plen_bits = [blue[perm[idx + i]] & 1 for i in range(32)]
-        payload_len = struct.unpack(
-            self.PAYLOAD_LEN_FMT,
-            np.packbits(plen_bits).tobytes()
-        )[0]
-        idx += 32
-
-        if payload_len <= 0 or payload_len > 10_000_000:
-            raise ValueError("Invalid or corrupted payload length")
+        payload_len = struct.unpack_from(self.PAYLOAD_LEN_FMT, header, idx)[0]
+        idx += 4
 
-        # ---- payload ----
-        payload_bits = [blue[perm[idx + i]] & 1 for i in range(payload_len * 8)]
-        payload = np.packbits(payload_bits).tobytes()
-        idx += payload_len * 8
+        end_bits = (idx + payload_len + 4) * 8
+        if payload_len <= 0 or end_bits > blue.size:
+            raise ValueError("Invalid or corrupted payload length")
 
-        # ---- CRC ----
-        crc_bits = [blue[perm[idx + i]] & 1 for i in range(32)]
-        crc_expected = struct.unpack(
-            self.CRC_FMT,
-            np.packbits(crc_bits).tobytes()
-        )[0]
+        # ---- payload + CRC, second gather ----
+        body_pos = positions_for(end_bits)[idx * 8: end_bits]
+        body = np.packbits(blue[body_pos] & 1).tobytes()
+        # A view avoids copying the payload out of the gathered body
+        payload = memoryview(body)[:payload_len]
+        crc_expected = struct.unpack_from(self.CRC_FMT, body, payload_len)[0]
 
-        if zlib.crc32(payload) & 0xFFFFFFFF != crc_expected:
+        if checksum(payload) != crc_expected:
             raise ValueError("CRC mismatch – wrong password or corrupted data")
 
         return {
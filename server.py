@@ -5,14 +5,32 @@
 import mimetypes
 import io
 import os
+import queue
+import secrets
+import shutil
 import importlib.util
+import threading
 import traceback
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from flask import Flask, request, jsonify, send_from_directory, send_file
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 
+# Sanitizing normalizes Unicode and runs regexes; names recur in bulk uploads
+_secure_filename = lru_cache(maxsize=4096)(secure_filename)
+
+# Optional dependency: Magika for model-based MIME detection
+try:
+    from magika import Magika
+except Exception:
+    Magika = None
+
 # Optional dependency: python-magic for accurate MIME detection
 try:
     import magic
@@ -35,86 +53,199 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 PLUGINS_DIR.mkdir(exist_ok=True)
 
 MAX_CONTENT_LENGTH = 200 * 1024 * 1024  # 200 MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB copy buffer
 
 # ================= FLASK APP =================
 
 app = Flask(__name__, static_folder="static", static_url_path="/static")
 app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
+# Behind a front-end server, hand file bodies to it instead of Python:
+# UNISTENO_X_SENDFILE=1 emits X-Sendfile (Apache / lighttpd), and
+# UNISTENO_X_ACCEL_PREFIX=/internal-uploads/ emits nginx X-Accel-Redirect
+# to an internal location aliased to the uploads directory.
+# Standalone, send_file goes through wsgi.file_wrapper, which gunicorn
+# serves with sendfile(2).
+app.config["USE_X_SENDFILE"] = os.environ.get("UNISTENO_X_SENDFILE") == "1"
+X_ACCEL_PREFIX = os.environ.get("UNISTENO_X_ACCEL_PREFIX")
+
 # ================= PLUGIN LOADING =================
 
 LOADED_PLUGINS = []
 
+# mime -> plugins that may handle it, in load order (filled lazily)
+MIME_INDEX = {}
+
+def _load_one(py: Path):
+    """
+    Import one plugin file and return its valid plugin instances.
+    """
+    found = []
+    name = py.stem
+    try:
+        spec = importlib.util.spec_from_file_location(f"plugins.{name}", py)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        candidates = []
+        for attr_name in dir(module):
+            attr = getattr(module, attr_name)
+            if isinstance(attr, type) and attr_name.lower().endswith("plugin"):
+                candidates.append(attr)
+
+        if hasattr(module, "plugin"):
+            candidates.append(getattr(module, "plugin"))
+
+        for cand in candidates:
+            try:
+                inst = cand() if isinstance(cand, type) else cand
+                has_can = callable(getattr(inst, "can_handle", None))
+                has_any = any(
+                    callable(getattr(inst, fn, None))
+                    for fn in ("analyze", "embed", "extract")
+                )
+
+                if has_can and has_any:
+                    found.append(inst)
+                else:
+                    print(f"[plugin] skipping {cand}")
+
+            except Exception as e:
+                print(f"[plugin] failed to instantiate {cand}: {e}")
+                traceback.print_exc()
+
+    except Exception as e:
+        print(f"[plugin] failed to load {py}: {e}")
+        traceback.print_exc()
+
+    return found
+
 def load_plugins():
     global LOADED_PLUGINS
-    LOADED_PLUGINS = []
+    MIME_INDEX.clear()
+
+    # Plugin modules import heavy dependencies and build tables at import
+    # time; load them concurrently, keeping discovery order in the result
+    paths = list(PLUGINS_DIR.glob("*.py"))
+    with ThreadPoolExecutor(max_workers=min(8, len(paths) or 1)) as ex:
+        LOADED_PLUGINS = [inst for found in ex.map(_load_one, paths) for inst in found]
+
+def _accepts(plugin, mime):
+    # Plugins without supported_mimes are always asked via can_handle
+    patterns = getattr(plugin, "supported_mimes", None)
+    if patterns is None:
+        return True
+    major = mime.split("/", 1)[0] + "/*"
+    return any(pat in ("*", mime, major) for pat in patterns)
+
+def plugins_for(mime: str):
+    """
+    Plugins whose supported_mimes cover mime, in load order.
+    can_handle still has the final say.
+    """
+    candidates = MIME_INDEX.get(mime)
+    if candidates is None:
+        candidates = [p for p in LOADED_PLUGINS if _accepts(p, mime)]
+        MIME_INDEX[mime] = candidates
+    return candidates
 
-    for py in PLUGINS_DIR.glob("*.py"):
-        name = py.stem
-        try:
-            spec = importlib.util.spec_from_file_location(f"plugins.{name}", py)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            candidates = []
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if isinstance(attr, type) and attr_name.lower().endswith("plugin"):
-                    candidates.append(attr)
-
-            if hasattr(module, "plugin"):
-                candidates.append(getattr(module, "plugin"))
-
-            for cand in candidates:
-                try:
-                    inst = cand() if isinstance(cand, type) else cand
-                    has_can = callable(getattr(inst, "can_handle", None))
-                    has_any = any(
-                        callable(getattr(inst, fn, None))
-                        for fn in ("analyze", "embed", "extract")
-                    )
+load_plugins()
 
-                    if has_can and has_any:
-                        LOADED_PLUGINS.append(inst)
-                    else:
-                        print(f"[plugin] skipping {cand}")
+# Plugins analyze independently, so /analyze runs them concurrently
+_PLUGIN_POOL = ThreadPoolExecutor(
+    max_workers=min(8, len(LOADED_PLUGINS) or 1),
+    thread_name_prefix="plugin"
+)
 
-                except Exception as e:
-                    print(f"[plugin] failed to instantiate {cand}: {e}")
-                    traceback.print_exc()
+# ================= MIME DETECTION =================
 
-        except Exception as e:
-            print(f"[plugin] failed to load {py}: {e}")
-            traceback.print_exc()
+MIME_BY_EXT = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".webp": "image/webp",
+    ".txt": "text/plain",
+    ".csv": "text/csv",
+    ".md": "text/markdown",
+    ".html": "text/html",
+    ".json": "application/json",
+    ".pdf": "application/pdf",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".flac": "audio/flac",
+    ".ogg": "audio/ogg",
+    ".m4a": "audio/mp4",
+    ".mp4": "video/mp4",
+    ".mkv": "video/x-matroska",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".webm": "video/webm",
+}
+
+# Magika samples only the head, middle and tail of a file and runs one
+# small model inference; below this confidence its answer is ignored
+MAGIKA_MIN_SCORE = 0.5
 
-load_plugins()
+try:
+    _MAGIKA = Magika() if Magika else None
+except Exception:
+    _MAGIKA = None
 
-# ================= MIME DETECTION =================
+# One libmagic handle for the process: opening it loads the magic database.
+# libmagic cookies are not thread-safe, so calls are serialized.
+try:
+    _MAGIC = magic.Magic(mime=True) if magic else None
+except Exception:
+    _MAGIC = None
+_MAGIC_LOCK = threading.Lock()
+
+def _magika_mime(filepath: Path):
+    res = _MAGIKA.identify_path(Path(filepath))
+    score = getattr(res, "score", None)
+    if score is None:
+        score = res.output.score  # magika < 0.6
+    if score < MAGIKA_MIN_SCORE:
+        return None
+    return res.output.mime_type
 
 def detect_mime(filepath: Path):
-    if magic:
+    # Known extensions are trusted; content sniffing only runs on a miss
+    mime = MIME_BY_EXT.get(filepath.suffix.lower())
+    if mime:
+        return mime
+
+    if _MAGIKA:
         try:
-            m = magic.Magic(mime=True)
-            return m.from_file(str(filepath))
+            mime = _magika_mime(filepath)
+            if mime:
+                return mime
         except Exception:
             pass
 
-    return {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".bmp": "image/bmp",
-        ".tiff": "image/tiff",
-        ".txt": "text/plain",
-        ".csv": "text/csv",
-        ".json": "application/json",
-        ".pdf": "application/pdf",
-        ".mp3": "audio/mpeg",
-        ".wav": "audio/wav",
-        ".mp4": "video/mp4",
-        ".mkv": "video/x-matroska",
-    }.get(filepath.suffix.lower(), "application/octet-stream")
+    if _MAGIC:
+        try:
+            with _MAGIC_LOCK:
+                return _MAGIC.from_file(str(filepath))
+        except Exception:
+            pass
+
+    return "application/octet-stream"
+
+# ================= DOWNLOAD DISPOSITION =================
+
+# Extracted payloads: extension -> (mimetype, as_attachment). Text is
+# shown inline, everything else downloads. Built once from the system
+# mime.types so /extract never calls guess_type.
+mimetypes.init()
+DISPOSITION_BY_EXT = {
+    ext: (mime, not mime.startswith("text/"))
+    for ext, mime in mimetypes.types_map.items()
+}
+DEFAULT_DISPOSITION = ("application/octet-stream", True)
 
 # ================= FILE TYPE HEURISTICS =================
 
@@ -131,17 +262,179 @@ def is_text_file(path: Path, blocksize: int = 4096):
     except Exception:
         return False
 
+# ================= ANALYSIS CACHE =================
+
+# Serialized /analyze responses keyed by (filename, mtime_ns, size,
+# options), LRU. Image plugins inline base64 PNGs, so one response can
+# run to tens of MB: the cache is bounded by bytes, not just entries.
+ANALYZE_CACHE_SIZE = 512
+ANALYZE_CACHE_MAX_BYTES = 64 << 20
+ANALYZE_CACHE_MAX_ENTRY = 4 << 20  # larger responses are not cached
+_ANALYZE_CACHE = OrderedDict()
+_ANALYZE_CACHE_BYTES = 0
+_ANALYZE_LOCK = threading.Lock()
+
+def _analyze_cache_get(key):
+    with _ANALYZE_LOCK:
+        body = _ANALYZE_CACHE.get(key)
+        if body is not None:
+            _ANALYZE_CACHE.move_to_end(key)
+        return body
+
+def _analyze_cache_put(key, body: bytes):
+    global _ANALYZE_CACHE_BYTES
+    if len(body) > ANALYZE_CACHE_MAX_ENTRY:
+        return
+    with _ANALYZE_LOCK:
+        old = _ANALYZE_CACHE.pop(key, None)
+        if old is not None:
+            _ANALYZE_CACHE_BYTES -= len(old)
+        _ANALYZE_CACHE[key] = body
+        _ANALYZE_CACHE_BYTES += len(body)
+        while (len(_ANALYZE_CACHE) > ANALYZE_CACHE_SIZE
+               or _ANALYZE_CACHE_BYTES > ANALYZE_CACHE_MAX_BYTES):
+            _, evicted = _ANALYZE_CACHE.popitem(last=False)
+            _ANALYZE_CACHE_BYTES -= len(evicted)
+
+def _analyze_cache_clear():
+    global _ANALYZE_CACHE_BYTES
+    with _ANALYZE_LOCK:
+        _ANALYZE_CACHE.clear()
+        _ANALYZE_CACHE_BYTES = 0
+
 # ================= HOUSEKEEPING =================
 
+JANITOR_INTERVAL = 60  # seconds between upload sweeps
+
 def cleanup_old_uploads(max_age_seconds: int = 3600):
     now = time.time()
-    for p in UPLOAD_DIR.iterdir():
+    removed = False
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            try:
+                # Plugin output directories are kept (unlink would fail)
+                if entry.is_dir(follow_symlinks=False):
+                    continue
+                if now - entry.stat().st_mtime > max_age_seconds:
+                    os.unlink(entry.path)
+                    removed = True
+            except Exception:
+                pass
+
+    # A re-uploaded name could otherwise hit a stale entry
+    if removed:
+        _analyze_cache_clear()
+
+def _janitor_loop():
+    while True:
         try:
-            if now - p.stat().st_mtime > max_age_seconds:
-                p.unlink()
+            cleanup_old_uploads()
         except Exception:
+            traceback.print_exc()
+        time.sleep(JANITOR_INTERVAL)
+
+# Sweeps run in the background so /upload never scans the directory
+threading.Thread(target=_janitor_loop, name="upload-janitor", daemon=True).start()
+
+# ================= BUFFER POOL =================
+
+# Reusable payload buffers in 8 / 16 MB tiers for payloads of 4-16 MB.
+# Each tier keeps at most POOL_DEPTH idle buffers (48 MB per process).
+# Smaller payloads are cheaper to read as plain bytes than into a
+# multi-MB buffer, and larger ones are rare, so both use stream.read().
+POOL_MIN_SIZE = 1 << 22
+POOL_TIERS = (1 << 23, 1 << 24)
+POOL_DEPTH = 2
+_POOLS = {size: queue.LifoQueue(maxsize=POOL_DEPTH) for size in POOL_TIERS}
+
+@contextmanager
+def pooled_buf(tier: int):
+    try:
+        buf = _POOLS[tier].get_nowait()
+    except queue.Empty:
+        buf = bytearray(tier)
+
+    try:
+        yield buf
+    finally:
+        try:
+            _POOLS[tier].put_nowait(buf)
+        except queue.Full:
             pass
 
+def read_into(stream, view: memoryview):
+    """
+    Fill view from stream; returns the number of bytes read.
+    """
+    n = 0
+    while n < len(view):
+        got = stream.readinto(view[n:])
+        if not got:
+            break
+        n += got
+    return n
+
+@contextmanager
+def read_payload(stream):
+    """
+    Yield the whole upload stream as a bytes-like object: a memoryview
+    into a pooled buffer for 4-16 MB payloads, plain bytes otherwise.
+    """
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+
+    # SpooledTemporaryFile only has readinto from Python 3.11 on
+    tier = next((t for t in POOL_TIERS if t >= size), None)
+    if tier is None or size < POOL_MIN_SIZE or not hasattr(stream, "readinto"):
+        yield stream.read()
+        return
+
+    with pooled_buf(tier) as buf:
+        view = memoryview(buf)
+        yield view[:read_into(stream, view[:size])]
+
+class MemoryviewReader(io.RawIOBase):
+    """
+    Read-only file object over a memoryview, so send_file can stream
+    a plugin's buffer without first copying it into a BytesIO.
+    """
+
+    def __init__(self, view: memoryview):
+        self.view = view.cast("B")
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: len(self.view)}
+        self.pos = max(0, base[whence] + offset)
+        return self.pos
+
+    def tell(self):
+        return self.pos
+
+    def readinto(self, b):
+        chunk = self.view[self.pos:self.pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self.pos += n
+        return n
+
+def plugin_error(e: Exception):
+    """
+    500 response for a failed plugin call. The traceback is only
+    formatted (which reads source lines from disk) in debug mode.
+    """
+    body = {"error": str(e)}
+    if app.debug:
+        body["trace"] = traceback.format_exc()
+    return jsonify(body), 500
+
 # ================= ROUTES =================
 
 @app.route("/")
@@ -149,8 +442,23 @@ def index():
     return send_from_directory(".", "index.html")
 
 # 🔹 Regular file serving (images, downloads, etc.)
+def accel_redirect(fname):
+    """
+    Empty response telling nginx to serve fname from X_ACCEL_PREFIX
+    (nginx also handles Range requests). None if fname escapes it.
+    """
+    target = safe_join(X_ACCEL_PREFIX, fname)
+    if target is None:
+        return None
+    mime, _ = mimetypes.guess_type(fname)
+    resp = app.response_class(mimetype=mime or "application/octet-stream")
+    resp.headers["X-Accel-Redirect"] = target
+    return resp
+
 @app.route("/uploads/<path:fname>")
 def serve_upload(fname):
+    if X_ACCEL_PREFIX:
+        return accel_redirect(fname) or (jsonify({"error": "file not found"}), 404)
     return send_from_directory(UPLOAD_DIR, fname, as_attachment=False)
 
 # 🔹 MEDIA STREAMING ROUTE (FIXES VIDEO RENDERING)
@@ -160,31 +468,45 @@ def serve_media(fname):
     if not full_path.exists():
         return jsonify({"error": "file not found"}), 404
 
+    if X_ACCEL_PREFIX:
+        return accel_redirect(fname) or (jsonify({"error": "file not found"}), 404)
+
     # conditional=True enables HTTP Range requests (required for <video>)
     return send_file(full_path, conditional=True)
 
 @app.route("/upload", methods=["POST"])
 def upload():
-    cleanup_old_uploads()
-
     f = request.files.get("file")
     if not f:
         return jsonify({"error": "no file provided"}), 400
 
-    filename = secure_filename(f.filename)
+    filename = _secure_filename(f.filename)
     if not filename:
         return jsonify({"error": "invalid filename"}), 400
 
-    save_path = UPLOAD_DIR / filename
+    # Atomically claim a unique name; a taken name gets a random suffix
     base, ext = os.path.splitext(filename)
-    i = 1
-    while save_path.exists():
-        filename = f"{base}_{i}{ext}"
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+    while True:
         save_path = UPLOAD_DIR / filename
-        i += 1
+        try:
+            fd = os.open(save_path, flags, 0o644)
+            break
+        except FileExistsError:
+            filename = f"{base}_{secrets.token_hex(4)}{ext}"
 
-    f.save(save_path)
-    return jsonify({"filename": filename, "size": save_path.stat().st_size})
+    # Large unbuffered copy: far fewer write syscalls than FileStorage.save
+    try:
+        with open(fd, "wb", buffering=0) as out:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            shutil.copyfileobj(f.stream, out, UPLOAD_CHUNK_SIZE)
+            size = out.tell()
+    except Exception:
+        save_path.unlink(missing_ok=True)
+        raise
+
+    return jsonify({"filename": filename, "size": size})
 
 @app.route("/analyze", methods=["POST"])
 def analyze():
@@ -193,22 +515,42 @@ def analyze():
         return jsonify({"error": "filename required"}), 400
 
     path = UPLOAD_DIR / fname
-    if not path.exists():
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         return jsonify({"error": "file not found"}), 404
 
-    mime = detect_mime(path)
-
     log_scale = request.form.get("log_scale", "1") == "1"
     scroll_speed = int(request.form.get("scroll_speed", "3"))
 
+    # Results only change with the file contents or the options
+    key = (fname, st.st_mtime_ns, st.st_size, log_scale, scroll_speed)
+
+    body = _analyze_cache_get(key)
+    if body is None:
+        response = analyze_file(fname, path, st.st_size, {
+            "log_scale": log_scale,
+            "scroll_speed": scroll_speed
+        })
+        # Serialize once: the cache is sized by, and serves, these bytes
+        body = app.json.dumps(response).encode("utf-8")
+        _analyze_cache_put(key, body)
+
+    return app.response_class(body, mimetype="application/json")
+
+def analyze_file(fname, path: Path, size: int, options: dict):
+    mime = detect_mime(path)
+
     response = {
         "filename": fname,
         "mime": mime,
-        "size": path.stat().st_size
+        "size": size
     }
 
     if mime.startswith("image/") and Image:
         try:
+            # Image.open is lazy: only the header is parsed. Never call
+            # im.load() here, metadata is all this response needs.
             with Image.open(path) as im:
                 response.update({
                     "type": "image",
@@ -232,22 +574,29 @@ def analyze():
             response["text_error"] = str(e)
 
     plugin_results = {}
-    options = {
-        "log_scale": log_scale,
-        "scroll_speed": scroll_speed
-    }
 
-    for plugin in LOADED_PLUGINS:
+    # can_handle is a cheap check, so filter serially before submitting
+    futures = []
+    for plugin in plugins_for(mime):
         try:
             if plugin.can_handle(mime, path):
-                plugin_results[plugin.name] = plugin.analyze(path, options)
+                futures.append(
+                    (plugin, _PLUGIN_POOL.submit(plugin.analyze, path, options))
+                )
+        except Exception as e:
+            plugin_results[f"{plugin.name}_error"] = str(e)
+
+    # Collect in load order so the response layout stays stable
+    for plugin, future in futures:
+        try:
+            plugin_results[plugin.name] = future.result()
         except Exception as e:
             plugin_results[f"{plugin.name}_error"] = str(e)
 
     if plugin_results:
         response["plugins"] = plugin_results
 
-    return jsonify(response)
+    return response
 
 @app.route("/embed", methods=["POST"])
 def embed():
@@ -259,18 +608,21 @@ def embed():
         return jsonify({"error": "filename and payload required"}), 400
 
     infile = UPLOAD_DIR / fname
-    payload_bytes = payload.read()
-    payload_name = secure_filename(payload.filename or "payload.bin")
-
-    for p in LOADED_PLUGINS:
-        try:
-            if p.can_handle(detect_mime(infile), infile) and hasattr(p, "embed"):
-                outname = f"embedded_{fname}"
-                outfile = UPLOAD_DIR / outname
-                info = p.embed(infile, payload_bytes, password, outfile, payload_name)
-                return jsonify({"outfile": outname, "info": info})
-        except Exception as e:
-            return jsonify({"error": str(e), "trace": traceback.format_exc()}), 500
+    payload_name = _secure_filename(payload.filename or "payload.bin")
+
+    # Large payloads are handed to the plugin as a memoryview into a
+    # pooled buffer, so plugins must accept any bytes-like object
+    with read_payload(payload.stream) as payload_bytes:
+        file_mime = detect_mime(infile)
+        for p in plugins_for(file_mime):
+            try:
+                if p.can_handle(file_mime, infile) and hasattr(p, "embed"):
+                    outname = f"embedded_{fname}"
+                    outfile = UPLOAD_DIR / outname
+                    info = p.embed(infile, payload_bytes, password, outfile, payload_name)
+                    return jsonify({"outfile": outname, "info": info})
+            except Exception as e:
+                return plugin_error(e)
 
     return jsonify({"error": "no plugin available"}), 400
 
@@ -283,30 +635,61 @@ def extract():
     if not infile.exists():
         return jsonify({"error": "file not found"}), 404
 
-    for p in LOADED_PLUGINS:
+    file_mime = detect_mime(infile)
+    for p in plugins_for(file_mime):
         try:
-            if p.can_handle(detect_mime(infile), infile) and hasattr(p, "extract"):
+            if p.can_handle(file_mime, infile) and hasattr(p, "extract"):
                 res = p.extract(infile, password)
 
-                if isinstance(res, dict) and isinstance(res.get("payload"), (bytes, bytearray)):
-                    payload = res["payload"]
+                # Payload may be bytes, a memoryview, or a file on disk
+                if isinstance(res, dict):
+                    if res.get("payload_path"):
+                        body = str(res["payload_path"])
+                    elif isinstance(res.get("payload"), memoryview):
+                        body = MemoryviewReader(res["payload"])
+                    elif isinstance(res.get("payload"), (bytes, bytearray)):
+                        body = io.BytesIO(res["payload"])
+                    else:
+                        return jsonify(res)
+
                     name = res.get("name", "extracted.bin")
-                    mime, _ = mimetypes.guess_type(name)
-                    return send_file(
-                        io.BytesIO(payload),
+                    mime, as_attachment = DISPOSITION_BY_EXT.get(
+                        os.path.splitext(name)[1].lower(), DEFAULT_DISPOSITION
+                    )
+                    resp = send_file(
+                        body,
                         download_name=name,
-                        as_attachment=not (mime and mime.startswith("text/")),
-                        mimetype=mime or "application/octet-stream"
+                        as_attachment=as_attachment,
+                        mimetype=mime
                     )
+                    # send_file only sizes paths and BytesIO objects itself
+                    if isinstance(body, MemoryviewReader):
+                        resp.content_length = len(body.view)
+                    return resp
                 return jsonify(res)
         except Exception as e:
-            return jsonify({"error": str(e), "trace": traceback.format_exc()}), 500
+            return plugin_error(e)
 
     return jsonify({"error": "no plugin available"}), 400
 
 # ================= ENTRY =================
 
+# UNISTENO_DEV=1 runs the Werkzeug debug server (reloader + tracebacks).
+# Otherwise gunicorn serves the app with threaded workers when installed.
+GUNICORN_ARGS = [
+    "gunicorn",
+    "-w", os.environ.get("UNISTENO_WORKERS", "4"),
+    "-k", "gthread", "--threads", "8",
+    "-b", os.environ.get("UNISTENO_BIND", "127.0.0.1:5000"),
+    "--timeout", "300",  # video analysis can take minutes
+    "server:app"
+]
+
 if __name__ == "__main__":
     print("Starting UniSteno server...")
     print(f"Loaded plugins: {[p.name for p in LOADED_PLUGINS]}")
-    app.run(debug=True)
+
+    if os.environ.get("UNISTENO_DEV") != "1" and shutil.which("gunicorn"):
+        os.execvp("gunicorn", GUNICORN_ARGS)
+
+    app.run(debug=os.environ.get("UNISTENO_DEV") == "1", threaded=True)
@@ -151,6 +151,87 @@
     $id("result-analyzers").insertAdjacentHTML("beforeend", html);
   }
 
+  /**
+   * Render video bitplanes from a single tiled mosaic video
+   * Mosaic rows = R / G / B / SUPER, columns = bit 0..7;
+   * each tile is cropped onto its own canvas every animation frame
+   */
+  function renderVideoMosaic(vbit) {
+    // Tiles are already downscaled server-side to their display size
+    const tileW = vbit.tile_width;
+    const tileH = vbit.tile_height;
+
+    let html = `
+      <h6 class='mt-4'>Bitplane Visualization</h6>
+      <video id="bitplane-mosaic" src="${base}${vbit.mosaic}"
+        muted autoplay loop playsinline
+        style="position:absolute;width:1px;height:1px;opacity:0">
+      </video>
+    `;
+
+    for (const ch of ["R", "G", "B", "SUPER"]) {
+      if (!vbit.planes[ch]) continue;
+
+      html += `
+        <div class="mb-3">
+          <strong>${ch} Channel</strong>
+          <div style="display:grid;grid-template-columns:repeat(8,1fr);gap:8px">
+      `;
+
+      for (let bit = 0; bit < 8; bit++) {
+        const pos = vbit.planes[ch][`bit_${bit}`];
+        if (!pos) continue;
+
+        html += `
+          <div style="text-align:center;font-size:11px">
+            <canvas
+              class="mosaic-tile"
+              data-row="${pos[0]}"
+              data-col="${pos[1]}"
+              width="${tileW}"
+              height="${tileH}"
+              style="
+                width:100%;
+                display:block;
+                background:black;
+                border-radius:4px;
+                border:1px solid rgba(255,255,255,.15);
+              ">
+            </canvas>
+            <div>Bit ${bit}</div>
+          </div>
+        `;
+      }
+
+      html += "</div></div>";
+    }
+
+    $id("result-analyzers").insertAdjacentHTML("beforeend", html);
+
+    const video = $id("bitplane-mosaic");
+    const tiles = [...document.querySelectorAll(".mosaic-tile")].map(c => ({
+      ctx: c.getContext("2d"),
+      sx: c.dataset.col * tileW,
+      sy: c.dataset.row * tileH,
+      w: c.width,
+      h: c.height
+    }));
+
+    function draw() {
+      // Stop once results are cleared
+      if (!video.isConnected) return;
+
+      if (video.readyState >= 2) {
+        for (const t of tiles) {
+          t.ctx.drawImage(video, t.sx, t.sy, tileW, tileH, 0, 0, t.w, t.h);
+        }
+      }
+      requestAnimationFrame(draw);
+    }
+
+    requestAnimationFrame(draw);
+  }
+
 
   /**
    * Render superimposed RGB bitplanes
@@ -424,7 +505,7 @@
         if (bit?.planes) renderBitplanes(bit.planes);
 
         const vbit = json.plugins?.video_bitplane_visualizer;
-        if (vbit?.planes) renderBitplanes(vbit.planes); 
+        if (vbit?.mosaic) renderVideoMosaic(vbit);
 
         const sup = json.plugins?.image_bitplane_superimposed;
         if (sup?.planes) renderSuperimposed(sup.planes);